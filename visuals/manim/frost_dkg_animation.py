@@ -1,6 +1,18 @@
+import itertools
+import math
+import multiprocessing
+import subprocess
+from pathlib import Path
+
 from manim import *
 import numpy as np
 
+config.renderer = "opengl"
+config.format = "mp4"
+config.movie_file_extension = ".mp4"
+config.ffmpeg_loglevel = "ERROR"
+config.write_all = False
+
 # Styles and color constants
 NODE_COLOR_INACTIVE = GREY_A
 NODE_COLOR_ACTIVE = GREEN_E
@@ -10,6 +22,17 @@ SHARE_COLOR = GREEN_B
 STAGE3_ARROW_COLOR = GREEN_E
 TICK_COLOR = GREEN_E
 STAGE_LABEL_PAD = 0.6
+LABEL_FONT_SIZE = 24
+TITLE_FONT_SIZE = 36
+
+_STAGE3_ARROW_KW = dict(
+    buff=0,
+    color=STAGE3_ARROW_COLOR,
+    stroke_width=6,
+    max_tip_length_to_length_ratio=0.1,  # smaller arrow head
+)
+
+_TEXT_CACHE: dict[str, Text] = {}
 
 
 class NodeBox(VGroup):
@@ -22,8 +45,11 @@ class NodeBox(VGroup):
             corner_radius=0.2, width=2.0, height=1.0, color=NODE_COLOR_INACTIVE
         )
         self.rect.set_fill(NODE_COLOR_INACTIVE, opacity=0.4)
-        self.text = Text(label, font_size=28)
+        if label not in _TEXT_CACHE:
+            _TEXT_CACHE[label] = Text(label, font_size=LABEL_FONT_SIZE)
+        self.text = _TEXT_CACHE[label].copy()
         self.text.move_to(self.rect.get_center())
+        self._border = max(self.rect.width, self.rect.height) / 2
 
         self.add(self.rect, self.text)
 
@@ -45,149 +71,163 @@ class NodeBox(VGroup):
 
     def edge_point(self, target: np.ndarray, margin: float = 0.1) -> np.ndarray:
         """Return a point on the rectangle's edge in the direction of *target*."""
-        direction = target - self.get_center()
-        direction_norm = np.linalg.norm(direction)
-        if direction_norm == 0:
-            return self.get_center()
-        unit = direction / direction_norm
-        border = max(self.rect.width, self.rect.height) / 2
-        return self.get_center() + unit * (border + margin)
+        center = self.get_center()
+        dx, dy = target[0] - center[0], target[1] - center[1]
+        norm = math.hypot(dx, dy)
+        if norm == 0:
+            return center
+        scale = (self._border + margin) / norm
+        return np.array([center[0] + dx * scale, center[1] + dy * scale, 0.0])
 
 
 class FrostDKGScene(Scene):
     """Main animation – visual walk-through of 3-party FROST DKG (no maths, only visuals)."""
 
     def construct(self):
-        # ----- Layout helpers ------------------------------------------------
-        p1_pos = LEFT * 3 + UP * 0.5
-        p2_pos = RIGHT * 3 + UP * 0.5
-        p3_pos = DOWN * 2
-
-        p1 = NodeBox("P1").move_to(p1_pos)
-        p2 = NodeBox("P2").move_to(p2_pos)
-        p3 = NodeBox("P3").move_to(p3_pos)
-
-        nodes = [p1, p2, p3]
+        self._intro(animate=True)
+        self._stage1()
+        self._stage2()
+        self._stage3()
+
+    def _intro(self, animate: bool = False):
+        self.p1 = NodeBox("P1").move_to(LEFT * 3 + UP * 0.5)
+        self.p2 = NodeBox("P2").move_to(RIGHT * 3 + UP * 0.5)
+        self.p3 = NodeBox("P3").move_to(DOWN * 2)
+        self.nodes = [self.p1, self.p2, self.p3]
+        nodes_group = VGroup(*self.nodes)
+
+        if animate:
+            self.play(*[FadeIn(node, shift=DOWN, scale=0.8) for node in self.nodes])
+            self.play(nodes_group.animate.move_to(ORIGIN))
+            self.wait(0.5)
+        else:
+            nodes_group.move_to(ORIGIN)
+            self.add(nodes_group)
+
+        self.edges = {
+            (a, b): (a.edge_point(b.get_center()), b.edge_point(a.get_center()))
+            for a, b in itertools.permutations(self.nodes, 2)
+        }
+        self.roles = {
+            node: [other for other in self.nodes if other is not node]
+            for node in self.nodes
+        }
+
+    def _brief(self, txt: str):
+        if txt not in _TEXT_CACHE:
+            _TEXT_CACHE[txt] = Text(txt, font_size=LABEL_FONT_SIZE)
+        info = _TEXT_CACHE[txt].copy()
+        info.to_edge(DOWN, buff=0.6)
+        self.play(Write(info))
+        self.wait(2)
+        self.play(FadeOut(info))
 
-        self.play(*[FadeIn(node, shift=DOWN, scale=0.8) for node in nodes])
-        nodes_group = VGroup(*nodes)
-        self.play(nodes_group.animate.move_to(ORIGIN))
-        self.wait(0.5)
+    def _arrow_between(self, a: NodeBox, b: NodeBox, color: str, width: int = 4):
+        start, end = self.edges[(a, b)]
+        return Arrow(
+            start=start,
+            end=end,
+            buff=0,
+            color=color,
+            stroke_width=width,
+        )
 
-        def brief(txt: str):
-            info = Text(txt, font_size=28)
-            info.to_edge(DOWN, buff=0.6)
-            self.play(Write(info))
-            self.wait(2)
-            self.play(FadeOut(info))
+    def _stage1(self):
+        nodes = self.nodes
 
-        # --------------------------------------------------------------------
-        # STAGE 1 – Commitments broadcast
-        stage1_label = Text("Stage 1 – Commitments", font_size=38)
+        stage1_label = Text("Stage 1 – Commitments", font_size=TITLE_FONT_SIZE)
         stage1_label.to_edge(UP, buff=STAGE_LABEL_PAD)
 
         self.play(FadeIn(stage1_label, shift=DOWN))
         self.wait(0.3)
 
-        brief("Each node chooses a secret curve & broadcasts commitments")
+        self._brief("Each node chooses a secret curve & broadcasts commitments")
 
-        def arrow_between(a: NodeBox, b: NodeBox, color: str, width: int = 4):
-            return Arrow(
-                start=a.edge_point(b.get_center()),
-                end=b.edge_point(a.get_center()),
-                buff=0,
-                color=color,
-                stroke_width=width,
-            )
+        poly_template = Tex(r"$f(x)=a_0+a_1x$", font_size=LABEL_FONT_SIZE, color=WHITE)
+        lbl_templates = [
+            Tex(r"$g^{c_{%d}}$" % idx, font_size=LABEL_FONT_SIZE, color=BROADCAST_COLOR)
+            for idx in (1, 2)
+        ]
 
         def broadcast_with_labels(from_node: NodeBox, others: list[NodeBox]):
-            arrows = VGroup()
-            labels = VGroup()
-            for idx, target in enumerate(others, start=1):
-                arrow = arrow_between(from_node, target, BROADCAST_COLOR, 4)
-                arrows.add(arrow)
-                lbl = Tex(r"$g^{c_{%d}}$" % idx, font_size=26, color=BROADCAST_COLOR)
-                lbl.move_to(arrow.get_center() + UP * 0.3)
-                labels.add(lbl)
-            return arrows, labels
-
-        def broadcast(from_node: NodeBox, others: list[VGroup]):
-            return VGroup(
-                *[
-                    arrow_between(from_node, target, BROADCAST_COLOR, 4)
-                    for target in others
-                ]
-            )
-
-        for active, others in ((p1, [p2, p3]), (p2, [p1, p3]), (p3, [p1, p2])):
-            self.play(
-                active.activate(), *[n.deactivate() for n in nodes if n != active]
-            )
-
-            poly = Tex(r"$f(x)=a_0+a_1x$", font_size=26, color=WHITE)
+            arrows_list = [
+                self._arrow_between(from_node, target, BROADCAST_COLOR, 4)
+                for target in others
+            ]
+            labels_list = [
+                lbl_templates[idx - 1].copy().move_to(arrow.get_center() + UP * 0.3)
+                for idx, arrow in enumerate(arrows_list, start=1)
+            ]
+            return VGroup(*arrows_list), VGroup(*labels_list)
+
+        for active in nodes:
+            others = self.roles[active]
+            self.play(active.activate(), *[n.deactivate() for n in others])
+
+            poly = poly_template.copy()
             poly.next_to(active, UP, buff=0.4)
             self.play(FadeIn(poly))
 
             arrows, labels = broadcast_with_labels(active, others)
-            self.play(Create(arrows, run_time=0.8))
+            self.play(FadeIn(arrows, run_time=0.8))
             self.play(FadeIn(labels))
             self.wait(0.3)
-            self.play(FadeOut(arrows), FadeOut(labels), FadeOut(poly))
+            self.play(FadeOut(VGroup(arrows, labels, poly)))
 
         self.wait(1)
         self.play(FadeOut(stage1_label))
 
-        # --------------------------------------------------------------------
-        # STAGE 2 – Share distribution & verification
-        stage2_label = Text("Stage 2 – Share distribution", font_size=38)
+    def _stage2(self):
+        nodes = self.nodes
+
+        stage2_label = Text("Stage 2 – Share distribution", font_size=TITLE_FONT_SIZE)
         stage2_label.to_edge(UP, buff=STAGE_LABEL_PAD)
 
         self.play(FadeIn(stage2_label, shift=DOWN))
         self.wait(0.3)
 
-        brief("Nodes exchange secret shares and verify them")
+        self._brief("Nodes exchange secret shares and verify them")
+
+        share_lbl_template = Tex(r"$s_{ij}$", font_size=LABEL_FONT_SIZE, color=SHARE_COLOR)
 
         def share_with_label(from_node: NodeBox, to_node: NodeBox):
-            arrow = arrow_between(from_node, to_node, SHARE_COLOR, 6)
-            lbl = Tex(r"$s_{ij}$", font_size=24, color=SHARE_COLOR)
+            arrow = self._arrow_between(from_node, to_node, SHARE_COLOR, 6)
+            lbl = share_lbl_template.copy()
             lbl.move_to(arrow.get_center() + UP * 0.25)
             return arrow, lbl
 
         def tick_at(target: Mobject):
-            tick = Text("✓", font_size=36, color=TICK_COLOR)
+            tick = Text("✓", font_size=TITLE_FONT_SIZE, color=TICK_COLOR)
             tick.next_to(target, direction=RIGHT, buff=0.1)
             return tick
 
-        for active, peers in ((p1, [p2, p3]), (p2, [p1, p3]), (p3, [p1, p2])):
-            self.play(
-                active.activate(), *[n.deactivate() for n in nodes if n != active]
-            )
+        for active in nodes:
+            peers = self.roles[active]
+            self.play(active.activate(), *[n.deactivate() for n in peers])
 
-            arrows = VGroup()
-            labels = VGroup()
-            for peer in peers:
-                arrow, lbl = share_with_label(active, peer)
-                arrows.add(arrow)
-                labels.add(lbl)
+            pairs = [share_with_label(active, peer) for peer in peers]
+            arrows = VGroup(*[arrow for arrow, _ in pairs])
+            labels = VGroup(*[lbl for _, lbl in pairs])
 
             self.play(GrowArrow(arrows[0]), GrowArrow(arrows[1]), run_time=1.0)
             self.play(FadeIn(labels))
             ticks = VGroup(*[tick_at(peer) for peer in peers])
             self.play(FadeIn(ticks, scale=0.3))
             self.wait(0.5)
-            self.play(FadeOut(arrows), FadeOut(labels), FadeOut(ticks))
+            self.play(FadeOut(VGroup(arrows, labels, ticks)))
 
         self.wait(1)
         self.play(FadeOut(stage2_label))
 
-        # --------------------------------------------------------------------
-        # STAGE 3 – Combine to form group keys
-        stage3_label = Text("Stage 3 – Combine keys", font_size=38)
+    def _stage3(self):
+        p1, p2, p3 = self.p1, self.p2, self.p3
+
+        stage3_label = Text("Stage 3 – Combine keys", font_size=TITLE_FONT_SIZE)
         stage3_label.to_edge(UP, buff=STAGE_LABEL_PAD)
         self.play(FadeIn(stage3_label, shift=DOWN))
         self.wait(0.5)
 
-        brief("Commitments ➜ group public key & Shares ➜ group private key")
+        self._brief("Commitments ➜ group public key & Shares ➜ group private key")
 
         top_y = 1.3
         self.play(
@@ -202,61 +242,104 @@ class FrostDKGScene(Scene):
         )
 
         # -----------------  Centered key labels + equations  -----------------
-        combine_text = Text("Group public key", font_size=24)
+        combine_text = Text("Group public key", font_size=LABEL_FONT_SIZE)
         pub_eq = Tex(
             r"$P_{\text{group}} = g^{a_0^{(1)} + a_0^{(2)} + a_0^{(3)}}$",
-            font_size=24,
+            font_size=LABEL_FONT_SIZE,
         )
         pub_eq.next_to(combine_text, RIGHT, buff=0.2)
         pub_group = VGroup(combine_text, pub_eq)
         pub_group.next_to(p3, DOWN, buff=3.0)
 
-        secret_text = Text("Group private key", font_size=24)
-        priv_eq = Tex(r"$s_{\text{group}} = s_{0}+s_{1}+s_{2}$", font_size=24)
+        secret_text = Text("Group private key", font_size=LABEL_FONT_SIZE)
+        priv_eq = Tex(r"$s_{\text{group}} = s_{0}+s_{1}+s_{2}$", font_size=LABEL_FONT_SIZE)
         priv_eq.next_to(secret_text, RIGHT, buff=0.2)
         secret_group = VGroup(secret_text, priv_eq)
         secret_group.next_to(pub_group, DOWN, buff=0.4)
 
-        arrow1 = Arrow(
-            start=p1.get_bottom(),
-            end=pub_group.get_top(),
-            buff=0,
-            color=STAGE3_ARROW_COLOR,
-            stroke_width=6,
-            max_tip_length_to_length_ratio=0.1,  # smaller arrow head
-        )
-        arrow2 = Arrow(
-            start=p2.get_bottom(),
-            end=pub_group.get_top(),
-            buff=0,
-            color=STAGE3_ARROW_COLOR,
-            stroke_width=6,
-            max_tip_length_to_length_ratio=0.1,  # smaller arrow head
-        )
-        arrow3 = Arrow(
-            start=p3.get_bottom(),
-            end=pub_group.get_top(),
-            buff=0,
-            color=STAGE3_ARROW_COLOR,
-            stroke_width=6,
-            max_tip_length_to_length_ratio=0.1,  # smaller arrow head
-        )
+        pub_top = pub_group.get_top()
+        starts = np.stack([p1.get_bottom(), p2.get_bottom(), p3.get_bottom()])
+        arrow1 = Arrow(start=starts[0], end=pub_top, **_STAGE3_ARROW_KW)
+        arrow2 = arrow1.copy().put_start_and_end_on(starts[1], pub_top)
+        arrow3 = arrow1.copy().put_start_and_end_on(starts[2], pub_top)
 
-        s0 = Tex(r"$s_{0}$", font_size=24, color=STAGE3_ARROW_COLOR).next_to(
+        s0 = Tex(r"$s_{0}$", font_size=LABEL_FONT_SIZE, color=STAGE3_ARROW_COLOR).next_to(
             arrow1, LEFT, buff=0.01
         )
-        s1 = Tex(r"$s_{1}$", font_size=24, color=STAGE3_ARROW_COLOR).next_to(
+        s1 = Tex(r"$s_{1}$", font_size=LABEL_FONT_SIZE, color=STAGE3_ARROW_COLOR).next_to(
             arrow2, RIGHT, buff=0.01
         )
-        s2 = Tex(r"$s_{2}$", font_size=24, color=STAGE3_ARROW_COLOR).next_to(
+        s2 = Tex(r"$s_{2}$", font_size=LABEL_FONT_SIZE, color=STAGE3_ARROW_COLOR).next_to(
             arrow3, RIGHT, buff=0.01
         )
 
         down_arrows = VGroup(arrow1, arrow2, arrow3)
         share_labels = VGroup(s0, s1, s2)
 
-        self.play(Create(down_arrows, lag_ratio=0.2))
+        self.play(LaggedStart(*[FadeIn(arrow) for arrow in down_arrows], lag_ratio=0.2))
         self.play(FadeIn(share_labels))
         self.play(FadeIn(pub_group))
         self.play(FadeIn(secret_group))
         self.wait(2)
+
+
+class FrostDKGStage1(FrostDKGScene):
+    def construct(self):
+        self._intro(animate=True)
+        self._stage1()
+
+
+class FrostDKGStage2(FrostDKGScene):
+    def construct(self):
+        self._intro()
+        self._stage2()
+
+
+class FrostDKGStage3(FrostDKGScene):
+    def construct(self):
+        self._intro()
+        self._stage3()
+
+
+STAGE_SCENES = ("FrostDKGStage1", "FrostDKGStage2", "FrostDKGStage3")
+
+
+def _render_stage(scene_name: str) -> str:
+    scene_cls = globals()[scene_name]
+    with tempconfig({"output_file": scene_name}):
+        scene = scene_cls()
+        scene.render()
+    return str(scene.renderer.file_writer.movie_file_path)
+
+
+def render_parallel(output_path: str = "media/frost_dkg_full.mp4") -> str:
+    """Render the three stages on separate cores and concatenate with ffmpeg."""
+    with multiprocessing.Pool(len(STAGE_SCENES)) as pool:
+        parts = pool.map(_render_stage, STAGE_SCENES)
+
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    concat_list = output.with_suffix(".parts.txt")
+    concat_list.write_text("".join(f"file '{part}'\n" for part in parts))
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(concat_list),
+            "-c",
+            "copy",
+            str(output),
+        ],
+        check=True,
+    )
+    concat_list.unlink()
+    return str(output)
+
+
+if __name__ == "__main__":
+    print(render_parallel())
@@ -1,31 +1,30 @@
-import json
 import os
+import re
 import subprocess
 
-report_path = "target/tarpaulin/coverage.json"
-with open(report_path, "r") as f:
-    data = json.load(f)
+import ijson
+import numpy as np
+
+SKIP_RE = re.compile(r"(?:/\.cargo/|target/debug/build|/tests/|/build\.rs$)")
 
+report_path = "target/tarpaulin/coverage.json"
 total_lines = 0
 covered_lines = 0
-files = data.get("files", [])
-
-for file_data in files:
-    file_path = os.path.join(*file_data.get("path", []))
-    if (
-        "/.cargo/" in file_path
-        or "target/debug/build" in file_path
-        or "/tests/" in file_path
-        or file_path.endswith("/build.rs")
-    ):
-        continue
-
-    trace_lines = file_data.get("traces", [])
-    for trace in trace_lines:
-        if "stats" in trace and "Line" in trace["stats"]:
-            total_lines += 1
-            if trace["stats"]["Line"] > 0:
-                covered_lines += 1
+
+with open(report_path, "rb") as f:
+    for file_data in ijson.items(f, "files.item"):
+        file_path = "/".join(file_data.get("path", ()))
+        if SKIP_RE.search(file_path):
+            continue
+
+        stats_iter = (
+            trace["stats"]["Line"]
+            for trace in file_data.get("traces", [])
+            if "stats" in trace and "Line" in trace["stats"]
+        )
+        line_hits = np.fromiter(stats_iter, dtype=np.int64)
+        total_lines += line_hits.size
+        covered_lines += int((line_hits > 0).sum())
 
 percentage = 0
 if total_lines > 0:
@@ -54,6 +53,11 @@ badge_command = [
 ]
 threshold_args = [f"{k}={v}" for k, v in thresholds.items()]
 badge_command.extend(threshold_args)
-subprocess.run(badge_command)
+subprocess.run(
+    badge_command,
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL,
+    check=True,
+)
 
 print(f"Badge created at {badge_path}")